@@ -57,12 +57,39 @@ RIGHT APPROACH:
 """
 
 import os
+import sys
+import asyncio
+import functools
 import json
-import glob as glob_module
+import math
+import mmap
+import multiprocessing
+import heapq
+import pickle
+import re
+import threading
+import time
+from bisect import bisect_left, bisect_right, insort
+from collections import OrderedDict
+from itertools import accumulate, chain, islice
 from pathlib import Path
-from typing import Optional, List, Dict, Any, Tuple
+from typing import Optional, List, Dict, Any, Tuple, Iterator, Set, NamedTuple
 from mcp.server.fastmcp import FastMCP
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+# orjson parses JSONL several times faster; ujson is the next best, and
+# stdlib json the fallback. All three accept bytes and raise ValueError.
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    try:
+        import ujson
+        _json_loads = ujson.loads
+    except ImportError:
+        _json_loads = json.loads
 
 # Initialize MCP server
 mcp = FastMCP("memory")
@@ -70,142 +97,487 @@ mcp = FastMCP("memory")
 # Path to Claude Code projects
 CLAUDE_PROJECTS_PATH = os.path.expanduser("~/.claude/projects")
 
+# On-disk snapshot of the conversation cache, so restarts skip re-parsing
+CACHE_SNAPSHOT_PATH = os.path.expanduser("~/.claude/.memory_mcp_cache.pickle")
+
+# Bump whenever the shape of cached conversation data changes
+CACHE_SNAPSHOT_VERSION = 17
+
+# pickle issues many small reads/writes; a 1MB buffer batches them into few syscalls
+SNAPSHOT_IO_BUFFER = 1024 * 1024
+
+# Worker threads used to re-parse changed conversation files
+PARSE_WORKERS = min(8, (os.cpu_count() or 1) * 2)
+
+# Re-parse batches at least this large (i.e. a cold cache) use worker processes
+PROCESS_POOL_MIN_FILES = 32
+
+# Bytes before the end of a parsed file kept to check that it was only
+# appended to when it next changes (see file_continues)
+RESUME_TAIL_BYTES = 64
+
+# Transcript messages between recorded parse checkpoints, from which a range
+# deep into a conversation can be read without parsing everything before it
+TRANSCRIPT_CHECKPOINT_INTERVAL = 256
+
 # In-memory conversation cache
-_conversation_cache: Dict[str, Dict[str, Any]] = {}
+_conversation_cache: Dict[str, 'ConversationEntry'] = {}
+_snapshot_loaded = False
+
+# Snapshots are written by a background thread so tool calls don't wait on
+# pickling. Only the newest pending copy of the cache is ever written.
+_snapshot_lock = threading.Lock()
+_snapshot_pending: Optional[Dict[str, 'ConversationEntry']] = None
+_snapshot_writer: Optional[threading.Thread] = None
+
+# sessionId recorded inside a JSONL file -> cache key (file name), for the
+# rare files whose name differs from the session they contain
+_session_aliases: Dict[str, str] = {}
+
+# (timestamp, session ID) for every cached session, kept sorted with insort
+# so list_conversations can walk it newest first without sorting
+_sessions_by_timestamp: List[Tuple[str, str]] = []
+
+# Project name -> session IDs cached for it, so project filters only visit
+# the distinct project names instead of every session
+_sessions_by_project: Dict[str, Set[str]] = {}
+
+# Trigram -> session IDs whose search text contains it (see SEARCH INDEX)
+_trigram_index: Dict[bytes, Set[str]] = {}
+
+# Sum of searchable lines (todos, or user arc) over all cached sessions,
+# for BM25's average document length
+_total_search_lines = 0
+
+# Parsed transcripts of recently read conversations, least recently used first
+# (see TRANSCRIPT CACHE). Bounded by the approximate size of message text, and
+# transcripts not read for TRANSCRIPT_CACHE_TTL seconds are let go.
+_transcript_cache: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+_transcript_cache_bytes = 0
+TRANSCRIPT_CACHE_MAX_BYTES = 64 * 1024 * 1024
+TRANSCRIPT_CACHE_TTL = 30 * 60
+
+# Results of recent list/search calls, least recently used first (see RESULT
+# CACHE). Keys include _cache_epoch, which ensure_cache_fresh bumps whenever a
+# conversation is added, changed or removed, so a hit is never stale.
+_result_cache: 'OrderedDict[tuple, Tuple[float, dict]]' = OrderedDict()
+_cache_epoch = 0
+RESULT_CACHE_MAX_ENTRIES = 256
+RESULT_CACHE_TTL = 60
+
+# (mtime_ns of CLAUDE_PROJECTS_PATH, project names) from the last
+# list_projects scan. Adding, removing or renaming a project directory
+# changes the parent's mtime, so an unchanged mtime means the same names.
+_projects_cache: Optional[Tuple[Optional[int], List[str]]] = None
+
+# BM25 parameters (standard Lucene/Elasticsearch defaults)
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Query terms: runs of word characters (Unicode-aware), so punctuation such
+# as "oauth," or "(kane)" doesn't end up inside a term
+QUERY_TERM_PATTERN = re.compile(r'\w+')
+
+# Entry types that count as conversation messages
+MESSAGE_TYPES = frozenset({'user', 'assistant'})
 
 
 # ============================================================================
 # CORE DATA EXTRACTION
 # ============================================================================
 
-def parse_jsonl_file(file_path: str) -> List[dict]:
-    """Parse a JSONL file and return raw entries"""
-    entries = []
+class TodoSnapshot(NamedTuple):
+    """The todo list as written by one TodoWrite call"""
+    message_index: int
+    timestamp: Optional[str]
+    todos: Tuple[Tuple[str, str], ...]  # (content, status) pairs
+
+
+class FinalTodos(NamedTuple):
+    """Todos of a conversation's last snapshot, by status"""
+    completed: Tuple[str, ...]
+    in_progress: Tuple[str, ...]
+    pending: Tuple[str, ...]
+
+
+class ConversationEntry(NamedTuple):
+    """
+    Everything cached about one conversation file.
+    Immutable once built, so readers and the snapshot writer can share it;
+    sequences are tuples, which are also smaller than lists.
+    """
+    session_id: str
+    project: str
+    first_message: str
+    user_message_arc: Tuple[str, ...]  # First + Last user messages
+    user_message_count: int  # Total user turns
+    user_message_arc_lower: Tuple[str, ...]
+    timestamp: str
+    todo_snapshots: Tuple[TodoSnapshot, ...]
+    final_todos: FinalTodos
+    todos: Tuple[str, ...]  # completed + in_progress + pending
+    todos_lower: Tuple[str, ...]  # Same order as todos
+    search_bytes_lower: bytes
+    search_byte_mask: int
+    search_line_starts: Tuple[int, ...]  # Offset of each line in search_bytes_lower
+    chapters: Tuple[Dict[str, Any], ...]
+    message_count: int  # Total messages (user + assistant)
+    transcript_length: int  # Messages with a body, as get_transcript returns them
+    # (byte offset, message_index, user_turn) after every
+    # TRANSCRIPT_CHECKPOINT_INTERVAL-th transcript message
+    transcript_checkpoints: Tuple[Tuple[int, int, int], ...]
+    list_entry: Dict[str, Any]  # The list_conversations row, minus sessionId
+    search_summary: str  # Summary shown with search_conversations results
+    resume_state: Optional[Dict[str, Any]]  # Where parsing appended lines picks up
+    # Stat of the file when it was parsed (set by parse_conversation_file)
+    mtime: float = 0.0
+    mtime_ns: int = 0
+    size: int = 0
+    file_path: str = ''
+
+
+def iter_jsonl_lines(file_path: str, start: int = 0,
+                     scan: Optional[Dict[str, Any]] = None) -> Iterator[Tuple[bytes, Any]]:
+    """
+    Yield (raw_line, entry) pairs from a JSONL file, beginning at byte offset
+    start. The raw bytes let callers run cheap substring checks before
+    walking the parsed entry.
+
+    If scan is given, scan['position'] is the offset just past the line most
+    recently yielded. If the file was read through to a final newline, scan
+    also gets the offset reached and the bytes just before it, from which a
+    later parse can pick up lines appended since (see file_continues).
+    """
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            for line in f:
-                line = line.strip()
-                if line:
-                    try:
-                        data = json.loads(line)
-                        entries.append(data)
-                    except json.JSONDecodeError:
+        # Binary mode: both parsers accept UTF-8 bytes, skipping a decode pass.
+        # The file is mapped rather than read, and lines are found with
+        # mmap.find, so newline scanning happens in C over the page cache.
+        with open(file_path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return  # mmap cannot map an empty file
+
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                size = len(mm)
+                pos = start
+                while pos < size:
+                    newline = mm.find(b'\n', pos)
+                    end = size if newline == -1 else newline
+                    line = mm[pos:end]
+                    pos = end + 1
+
+                    if not line or line.isspace():
                         continue
+                    try:
+                        data = _json_loads(line)
+                    except ValueError:  # JSONDecodeError (all parsers) / bad UTF-8
+                        # orjson and ujson reject lone UTF-16 surrogate escapes
+                        # (a string cut mid-emoji), which stdlib json accepts
+                        try:
+                            data = json.loads(line)
+                        except ValueError:
+                            continue
+                    if scan is not None:
+                        scan['position'] = pos
+                    yield line, data
+
+                if scan is not None and mm[size - 1:size] == b'\n':
+                    scan['offset'] = size
+                    scan['tail'] = mm[max(0, size - RESUME_TAIL_BYTES):size]
     except Exception as e:
         print(f"Error reading file {file_path}: {e}")
 
-    return entries
+
+def file_continues(file_path: str, offset: int, tail: bytes) -> bool:
+    """
+    Whether the file still has `tail` just before `offset`, i.e. it was only
+    appended to since it was read up to there, not rewritten or truncated.
+    """
+    try:
+        with open(file_path, 'rb') as f:
+            f.seek(offset - len(tail))
+            return f.read(len(tail)) == tail
+    except OSError:
+        return False
+
+
+def parse_jsonl_file(file_path: str) -> Iterator[dict]:
+    """
+    Parse a JSONL file, yielding raw entries one at a time.
+    Wrap in list() where random access is needed.
+    """
+    for _, entry in iter_jsonl_lines(file_path):
+        yield entry
 
 
 def extract_text_content(content: Any) -> str:
-    """Extract text content from various message content formats"""
-    if isinstance(content, str):
+    """
+    Extract text content from various message content formats.
+    Decoded JSON only holds exact str/list/dict, so `type(x) is` checks
+    stand in for the slower isinstance().
+    """
+    content_type = type(content)
+    if content_type is str:
         return content
 
-    if isinstance(content, list):
-        text_parts = []
-        for item in content:
-            if isinstance(item, str):
-                text_parts.append(item)
-            elif isinstance(item, dict) and item.get("type") == "text":
-                text_parts.append(item.get("text", ""))
-        return " ".join(text_parts)
+    if content_type is list:
+        return " ".join(
+            item if type(item) is str else item.get("text", "")
+            for item in content
+            if type(item) is str or (type(item) is dict and item.get("type") == "text")
+        )
 
     return ""
 
 
-def extract_conversation_data(jsonl_file: str) -> Dict[str, Any]:
+def extract_message(entry: dict) -> Optional[Tuple[str, str]]:
+    """
+    Role and display text of a user/assistant entry with a message body.
+    Returns None for every other entry.
+    """
+    message = entry.get('message')
+    if not message:
+        return None
+
+    entry_type = entry.get('type')
+    if entry_type == 'user':
+        return 'user', extract_text_content(message.get('content', ''))
+
+    if entry_type == 'assistant':
+        text_parts = []
+        for item in message.get('content', []):
+            if type(item) is dict and item.get('type') == 'text':
+                text_parts.append(item.get('text', ''))
+        return 'assistant', '\n'.join(text_parts)
+
+    return None
+
+
+def extract_conversation_data(jsonl_file: str,
+                              previous: Optional[ConversationEntry] = None) -> ConversationEntry:
     """
     Parse JSONL file and extract:
     - All TodoWrite snapshots with message indices
     - Final todo state (last snapshot)
     - Chapter breaks (when todos completed)
     - Metadata (project, timestamp, user message arc)
-    """
-    entries = parse_jsonl_file(jsonl_file)
 
+    Given the previous entry for a file that has only been appended to since,
+    only the new lines are parsed and folded into its state.
+    """
     todo_snapshots = []
     message_index = 0
     session_id = None
     timestamp = None
-    user_messages = []  # Collect all user messages for summary arc
+    # Summary arc only needs the first and last user message, not all of them
+    first_user_message = None
+    last_user_message = None
+    user_message_count = 0
+    transcript_length = 0
+    transcript_user_turn = 0
+    transcript_checkpoints = []
+    start = 0
+
+    resume = previous.resume_state if previous is not None else None
+    if resume is not None and file_continues(jsonl_file, resume['offset'], resume['tail']):
+        start = resume['offset']
+        todo_snapshots = list(previous.todo_snapshots)
+        message_index = previous.message_count
+        user_message_count = previous.user_message_count
+        transcript_length = previous.transcript_length
+        transcript_user_turn = resume['transcript_user_turn']
+        transcript_checkpoints = list(previous.transcript_checkpoints)
+        session_id = resume['session_id']
+        timestamp = resume['timestamp']
+        first_user_message = resume['first_user_message']
+        last_user_message = resume['last_user_message']
+
+    scan = {}
+    for raw_line, entry in iter_jsonl_lines(jsonl_file, start, scan):
+        entry_type = entry.get('type')
+        message = entry.get('message')
 
-    for entry in entries:
         # Extract session ID
-        if 'sessionId' in entry and not session_id:
+        if not session_id and 'sessionId' in entry:
             session_id = entry['sessionId']
 
         # Collect user messages for summary arc
-        if entry.get('type') == 'user' and entry.get('message'):
-            msg_content = extract_text_content(entry['message'].get('content', ''))
+        if entry_type == 'user' and message:
+            msg_content = extract_text_content(message.get('content', ''))
             if msg_content:
-                user_messages.append(msg_content[:200])  # Truncate long messages
+                user_message_count += 1
+                last_user_message = msg_content
+                if first_user_message is None:
+                    first_user_message = msg_content[:200]  # Truncate long messages
                 if not timestamp:
                     timestamp = entry.get('timestamp')
 
-        # Count messages
-        if entry.get('type') in ['user', 'assistant']:
+        # Count messages, and those get_transcript keeps (ones with a body),
+        # noting where to resume reading the transcript every so often
+        if entry_type in MESSAGE_TYPES:
             message_index += 1
-
-        # Extract TodoWrite tool calls
-        if entry.get('type') == 'assistant' and entry.get('message'):
-            for content_item in entry['message'].get('content', []):
-                if (isinstance(content_item, dict) and
+            if message:
+                transcript_length += 1
+                if entry_type == 'user':
+                    transcript_user_turn += 1
+                if transcript_length % TRANSCRIPT_CHECKPOINT_INTERVAL == 0:
+                    transcript_checkpoints.append(
+                        (scan['position'], message_index, transcript_user_turn)
+                    )
+
+        # Extract TodoWrite tool calls. The tool name has to appear literally
+        # in the raw line, so a single bytes scan rules out nearly every
+        # assistant entry before its content list is walked.
+        if (entry_type == 'assistant' and message and
+            b'TodoWrite' in raw_line):
+            for content_item in message.get('content', []):
+                if (type(content_item) is dict and
                     content_item.get('type') == 'tool_use' and
                     'TodoWrite' in content_item.get('name', '')):
 
                     todos = content_item.get('input', {}).get('todos', [])
-                    todo_snapshots.append({
-                        'message_index': message_index,
-                        'timestamp': entry.get('timestamp'),
-                        'todos': todos
-                    })
+                    todo_snapshots.append(TodoSnapshot(
+                        message_index, entry.get('timestamp'), compact_todos(todos)
+                    ))
 
     # Calculate final state and chapters
-    final_todos = {'completed': [], 'in_progress': [], 'pending': []}
+    todos_by_status = {'completed': [], 'in_progress': [], 'pending': []}
     chapters = []
 
     if todo_snapshots:
         # Get final state from last snapshot
-        for todo in todo_snapshots[-1]['todos']:
-            status = todo.get('status', 'pending')
-            content = todo.get('content', '')
+        for content, status in todo_snapshots[-1].todos:
             if content:
-                final_todos[status].append(content)
+                todos_by_status[status].append(content)
 
         # Calculate chapters from completion points
         chapters = calculate_chapters(todo_snapshots)
 
+    final_todos = FinalTodos(
+        tuple(todos_by_status['completed']),
+        tuple(todos_by_status['in_progress']),
+        tuple(todos_by_status['pending'])
+    )
+
     # Build user message arc for conversations without todos
     # First + Last gives opening and closing context
     user_message_arc = []
-    user_message_count = len(user_messages)
 
     if user_message_count > 0:
         # First message
-        user_message_arc.append(user_messages[0])
+        user_message_arc.append(first_user_message)
         # Last message (if different from first)
         if user_message_count > 1:
-            user_message_arc.append(user_messages[-1])
-
-    # Extract project name from file path
-    project = os.path.basename(os.path.dirname(jsonl_file))
+            user_message_arc.append(last_user_message[:200])
+
+    # Lowercase searchable text once per parse rather than once per query.
+    # Lowered todos recur across sessions just like the originals, so they
+    # are interned too.
+    todos = final_todos.completed + final_todos.in_progress + final_todos.pending
+    todos_lower = tuple(sys.intern(todo.lower()) for todo in todos)
+    user_message_arc_lower = tuple(msg.lower() for msg in user_message_arc)
+
+    # Everything search_conversations can match, as one lowercase UTF-8 blob.
+    # Query terms never contain whitespace, so a term absent here matches no
+    # single line; UTF-8 is self-synchronizing, so byte containment equals
+    # text containment, and non-ASCII text takes 1-4x less memory than str.
+    # Line start offsets map a match back to the todo (or arc message).
+    search_lines = [encode_search_text(line) for line in todos_lower or user_message_arc_lower]
+    search_bytes_lower = b'\n'.join(search_lines)
+    search_line_starts = ()
+    if search_lines:
+        search_line_starts = tuple(accumulate((len(line) + 1 for line in search_lines[:-1]), initial=0))
+
+    # Extract project name from file path (a few projects, many sessions each)
+    project = sys.intern(os.path.basename(os.path.dirname(jsonl_file)))
+
+    # Use todo summary if available, otherwise use user message arc.
+    # Search results show a more tightly truncated arc than the list.
+    if final_todos.completed:
+        summary = search_summary = ', '.join(final_todos.completed[:3])
+    elif len(user_message_arc) == 1:
+        summary = f"[1 turn] {user_message_arc[0]}"
+        search_summary = f"[{user_message_count} turns] {user_message_arc[0][:100]}"
+    elif len(user_message_arc) == 2:
+        summary = f"[{user_message_count} turns] {user_message_arc[0]} ... {user_message_arc[1]}"
+        search_summary = f"[{user_message_count} turns] {user_message_arc[0][:80]} ... {user_message_arc[1][:80]}"
+    else:
+        summary = first_user_message or 'No message'
+        search_summary = summary[:100]
+
+    # Parser state at the end of the file, to resume from once lines are
+    # appended. A file not ending in a newline may have a half-written last
+    # line, so it always gets a full re-parse instead.
+    resume_state = None
+    if 'offset' in scan:
+        resume_state = {
+            'offset': scan['offset'],
+            'tail': scan['tail'],
+            'session_id': session_id,
+            'timestamp': timestamp,
+            'first_user_message': first_user_message,
+            'last_user_message': last_user_message and last_user_message[:200],
+            'transcript_user_turn': transcript_user_turn
+        }
 
-    return {
-        'session_id': session_id or 'unknown',
+    # The list_conversations row, minus sessionId (the cache key)
+    list_entry = {
         'project': project,
-        'first_message': user_messages[0] if user_messages else 'No message',
-        'user_message_arc': user_message_arc,  # First + Last user messages
-        'user_message_count': user_message_count,  # Total user turns
         'timestamp': timestamp or '',
-        'todo_snapshots': todo_snapshots,
-        'final_todos': final_todos,
-        'chapters': chapters,
-        'message_count': message_index  # Total messages (user + assistant)
+        'summary': summary,
+        'completed': final_todos.completed,
+        'inProgress': final_todos.in_progress,
+        'pending': final_todos.pending,
+        'messageCount': message_index,
+        'userMessageCount': user_message_count,
+        'hasChapters': len(chapters) > 0
     }
 
+    return ConversationEntry(
+        session_id=session_id or 'unknown',
+        project=project,
+        first_message=first_user_message or 'No message',
+        user_message_arc=tuple(user_message_arc),
+        user_message_count=user_message_count,
+        user_message_arc_lower=user_message_arc_lower,
+        timestamp=timestamp or '',
+        todo_snapshots=tuple(todo_snapshots),
+        final_todos=final_todos,
+        todos=todos,
+        todos_lower=todos_lower,
+        search_bytes_lower=search_bytes_lower,
+        search_byte_mask=byte_mask(search_bytes_lower),
+        search_line_starts=search_line_starts,
+        chapters=tuple(chapters),
+        message_count=message_index,
+        transcript_length=transcript_length,
+        transcript_checkpoints=tuple(transcript_checkpoints),
+        list_entry=list_entry,
+        search_summary=search_summary,
+        resume_state=resume_state
+    )
+
+
+def compact_todos(todos: List[dict]) -> Tuple[Tuple[str, str], ...]:
+    """
+    Reduce TodoWrite input to the (content, status) pairs we read back.
 
-def calculate_chapters(todo_snapshots: List[Dict]) -> List[Dict]:
+    The same todo text recurs in every snapshot; interning it makes the
+    repeats one object, so set lookups in calculate_chapters hit the
+    identity fast path instead of comparing long strings.
+    """
+    compact = []
+    for todo in todos:
+        content = todo.get('content', '')
+        status = todo.get('status', 'pending')
+        if isinstance(content, str):
+            content = sys.intern(content)
+        if isinstance(status, str):
+            status = sys.intern(status)
+        compact.append((content, status))
+    return tuple(compact)
+
+
+def calculate_chapters(todo_snapshots: List[TodoSnapshot]) -> List[Dict]:
     """
     Calculate chapter breaks based on when todos were completed.
     Each completed todo marks the end of a phase of work.
@@ -218,71 +590,657 @@ def calculate_chapters(todo_snapshots: List[Dict]) -> List[Dict]:
     prev_message_idx = 0
 
     for snapshot in todo_snapshots:
-        for todo in snapshot['todos']:
-            todo_content = todo.get('content', '')
-            if (todo.get('status') == 'completed' and
+        for todo_content, status in snapshot.todos:
+            if (status == 'completed' and
                 todo_content and
                 todo_content not in completed_todos):
 
                 # New completion found - create chapter
                 chapters.append({
                     'title': todo_content,
-                    'message_range': (prev_message_idx, snapshot['message_index']),
-                    'completed_at': snapshot['message_index'],
-                    'message_count': snapshot['message_index'] - prev_message_idx
+                    'message_range': (prev_message_idx, snapshot.message_index),
+                    'completed_at': snapshot.message_index,
+                    'message_count': snapshot.message_index - prev_message_idx
                 })
 
                 completed_todos.add(todo_content)
-                prev_message_idx = snapshot['message_index']
+                prev_message_idx = snapshot.message_index
 
     return chapters
 
 
+# ============================================================================
+# SEARCH INDEX
+# ============================================================================
+
+def encode_search_text(text: str) -> bytes:
+    """Encode lowercased search text or query terms for byte-level matching"""
+    return text.encode('utf-8', 'surrogatepass')
+
+
+def byte_mask(text: bytes) -> int:
+    """256-bit set of the byte values occurring in text"""
+    mask = 0
+    for byte in set(text):
+        mask |= 1 << byte
+    return mask
+
+
+def text_trigrams(text: bytes) -> Set[bytes]:
+    """All 3-byte substrings of text"""
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def search_line_count(data: ConversationEntry) -> int:
+    """BM25 document length: the number of lines search_conversations matches against"""
+    return len(data.todos_lower) or len(data.user_message_arc_lower)
+
+
+def index_conversation(session_id: str, data: ConversationEntry):
+    """Add a conversation's search text to the trigram index"""
+    global _total_search_lines
+
+    for trigram in text_trigrams(data.search_bytes_lower):
+        _trigram_index.setdefault(trigram, set()).add(session_id)
+    _total_search_lines += search_line_count(data)
+
+
+def unindex_conversation(session_id: str, data: ConversationEntry):
+    """Remove a conversation's postings from the trigram index"""
+    global _total_search_lines
+
+    for trigram in text_trigrams(data.search_bytes_lower):
+        postings = _trigram_index.get(trigram)
+        if postings is not None:
+            postings.discard(session_id)
+            if not postings:
+                del _trigram_index[trigram]
+    _total_search_lines -= search_line_count(data)
+
+
+def sessions_containing(term: bytes) -> Set[str]:
+    """
+    Session IDs whose search text contains the (encoded) term.
+
+    A term can only occur in text that contains every one of its trigrams,
+    so only sessions in the intersection of those postings are checked.
+    Terms shorter than 3 bytes have no trigrams; sessions missing any of
+    their byte values are ruled out with one AND per session instead.
+    """
+    if len(term) < 3:
+        term_mask = byte_mask(term)
+        candidates = [
+            session_id for session_id, data in _conversation_cache.items()
+            if data.search_byte_mask & term_mask == term_mask
+        ]
+    else:
+        postings = sorted((_trigram_index.get(t, set()) for t in text_trigrams(term)), key=len)
+        candidates = postings[0].intersection(*postings[1:])
+
+    return {
+        session_id for session_id in candidates
+        if term in _conversation_cache[session_id].search_bytes_lower
+    }
+
+
+def search_line_hits(data: ConversationEntry, term: bytes) -> Set[int]:
+    """
+    Indexes of the search lines (todos, or arc messages) containing term.
+    Scans the session's search blob with bytes.find, jumping to the next
+    line after each hit, so only matching lines cost any Python work.
+    """
+    text = data.search_bytes_lower
+    line_starts = data.search_line_starts
+    hits = set()
+
+    pos = text.find(term)
+    while pos != -1:
+        line = bisect_right(line_starts, pos) - 1
+        hits.add(line)
+        if line + 1 == len(line_starts):
+            break
+        pos = text.find(term, line_starts[line + 1])
+
+    return hits
+
+
+def bm25_idf(document_frequency: int) -> float:
+    """Inverse document frequency of a term found in that many sessions"""
+    n = len(_conversation_cache)
+    return math.log(1 + (n - document_frequency + 0.5) / (document_frequency + 0.5))
+
+
+def bm25_term_weight(term_frequency: int, line_count: int) -> float:
+    """BM25 term-frequency saturation, normalized by session length"""
+    avg_line_count = _total_search_lines / len(_conversation_cache) if _conversation_cache else 0
+    length_norm = 1 - BM25_B + BM25_B * line_count / avg_line_count if avg_line_count else 1
+    return term_frequency * (BM25_K1 + 1) / (term_frequency + BM25_K1 * length_norm)
+
+
 # ============================================================================
 # CACHE MANAGEMENT
 # ============================================================================
 
-def ensure_cache_fresh():
+def iter_project_dirs():
+    """Yield os.DirEntry objects for project directories (hidden ones skipped)"""
+    try:
+        with os.scandir(CLAUDE_PROJECTS_PATH) as it:
+            for entry in it:
+                if not entry.name.startswith('.') and entry.is_dir():
+                    yield entry
+    except FileNotFoundError:
+        return
+
+
+def iter_conversation_files():
     """
-    Check file mtimes and re-parse only changed conversations.
-    First run: ~5s to parse all files
-    Subsequent: ~60ms (stat calls + search)
+    Yield os.DirEntry objects for every conversation JSONL file.
+    One scandir pass per project; entries carry their own stat() result.
     """
-    global _conversation_cache
+    for project_dir in iter_project_dirs():
+        try:
+            with os.scandir(project_dir.path) as it:
+                for entry in it:
+                    if (entry.name.endswith('.jsonl') and
+                        not entry.name.startswith('.') and
+                        entry.is_file()):
+                        yield entry
+        except OSError as e:
+            print(f"Error scanning {project_dir.path}: {e}", file=sys.stderr)
+            continue
+
+
+def load_cache_snapshot() -> Dict[str, ConversationEntry]:
+    """Load the persisted conversation cache, or an empty dict if unusable"""
+    try:
+        with open(CACHE_SNAPSHOT_PATH, 'rb', buffering=SNAPSHOT_IO_BUFFER) as f:
+            snapshot = pickle.load(f)
+    except FileNotFoundError:
+        return {}
+    except Exception as e:
+        print(f"Error loading cache snapshot {CACHE_SNAPSHOT_PATH}: {e}", file=sys.stderr)
+        return {}
 
-    # Get all conversation files
-    all_files = glob_module.glob(os.path.join(CLAUDE_PROJECTS_PATH, "*", "*.jsonl"))
+    if not isinstance(snapshot, dict) or snapshot.get('version') != CACHE_SNAPSHOT_VERSION:
+        return {}
 
-    for file_path in all_files:
+    return snapshot.get('conversations', {})
+
+
+def save_cache_snapshot(conversations: Dict[str, ConversationEntry]):
+    """Atomically persist the conversation cache next to the projects dir"""
+    tmp_path = f"{CACHE_SNAPSHOT_PATH}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'wb', buffering=SNAPSHOT_IO_BUFFER) as f:
+            pickle.dump({
+                'version': CACHE_SNAPSHOT_VERSION,
+                'conversations': conversations
+            }, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, CACHE_SNAPSHOT_PATH)
+    except Exception as e:
+        print(f"Error saving cache snapshot {CACHE_SNAPSHOT_PATH}: {e}", file=sys.stderr)
         try:
-            current_mtime = os.path.getmtime(file_path)
+            os.remove(tmp_path)
+        except OSError:
+            pass
+
+
+def schedule_snapshot_save():
+    """
+    Persist the current cache in the background.
+
+    Cached entries are never mutated once stored, so a shallow copy of the
+    dict is a consistent snapshot. If a write is already running, the copy
+    waits for it and replaces any older copy still waiting.
+    """
+    global _snapshot_pending, _snapshot_writer
+
+    with _snapshot_lock:
+        _snapshot_pending = dict(_conversation_cache)
+        if _snapshot_writer is None:
+            # Not a daemon, so a pending write still finishes on shutdown
+            _snapshot_writer = threading.Thread(target=write_pending_snapshots, name='memory-snapshot')
+            _snapshot_writer.start()
+
+
+def write_pending_snapshots():
+    """Snapshot writer thread: save pending copies until none are left"""
+    global _snapshot_pending, _snapshot_writer
+
+    while True:
+        with _snapshot_lock:
+            conversations = _snapshot_pending
+            _snapshot_pending = None
+            if conversations is None:
+                _snapshot_writer = None
+                return
+        save_cache_snapshot(conversations)
+
+
+def parse_conversation_file(file_path: str, stat: os.stat_result,
+                            previous: Optional[ConversationEntry] = None) -> Optional[ConversationEntry]:
+    """
+    Extract one conversation and stamp it with the stat it was parsed at.
+    previous, if given, is the cached entry of a file that has grown.
+    """
+    try:
+        data = extract_conversation_data(file_path, previous)
+    except Exception as e:
+        print(f"Error processing {file_path}: {e}")
+        return None
+
+    return data._replace(
+        mtime=stat.st_mtime,
+        mtime_ns=stat.st_mtime_ns,
+        size=stat.st_size,
+        file_path=file_path
+    )
+
+
+def cache_conversation(session_id: str, data: ConversationEntry):
+    """Insert or replace a cached conversation, keeping indexes in sync"""
+    previous = _conversation_cache.get(session_id)
+    if previous is not None:
+        # The file changed, so any transcript read from it is stale
+        drop_transcript(session_id)
+        unindex_conversation(session_id, previous)
+        unlist_conversation(session_id, previous)
+        if _session_aliases.get(previous.session_id) == session_id:
+            del _session_aliases[previous.session_id]
+
+    _conversation_cache[session_id] = data
+    index_conversation(session_id, data)
+    insort(_sessions_by_timestamp, (data.timestamp, session_id))
+    _sessions_by_project.setdefault(data.project, set()).add(session_id)
+
+    inner_session_id = data.session_id
+    if inner_session_id and inner_session_id not in ('unknown', session_id):
+        _session_aliases[inner_session_id] = session_id
+
+
+def evict_conversation(session_id: str):
+    """Remove a cached conversation and its index postings"""
+    data = _conversation_cache.pop(session_id, None)
+    drop_transcript(session_id)
+    if data is not None:
+        unindex_conversation(session_id, data)
+        unlist_conversation(session_id, data)
+        if _session_aliases.get(data.session_id) == session_id:
+            del _session_aliases[data.session_id]
+
+
+def get_cached_conversation(session_id: str) -> Optional[ConversationEntry]:
+    """
+    Look up a conversation by session ID in O(1).
+    Falls back to the sessionId recorded inside the file when no file is
+    named after it.
+    """
+    data = _conversation_cache.get(session_id)
+    if data is None and session_id in _session_aliases:
+        data = _conversation_cache.get(_session_aliases[session_id])
+    return data
+
+
+def unlist_conversation(session_id: str, data: ConversationEntry):
+    """Remove a conversation from _sessions_by_timestamp and _sessions_by_project"""
+    key = (data.timestamp, session_id)
+    i = bisect_left(_sessions_by_timestamp, key)
+    if i < len(_sessions_by_timestamp) and _sessions_by_timestamp[i] == key:
+        del _sessions_by_timestamp[i]
+
+    sessions = _sessions_by_project.get(data.project)
+    if sessions is not None:
+        sessions.discard(session_id)
+        if not sessions:
+            del _sessions_by_project[data.project]
+
+
+def projects_matching(project: str) -> List[str]:
+    """
+    Cached project names containing the project filter. There are only a
+    few distinct names, so this substring scan is cheap.
+    """
+    return [name for name in _sessions_by_project if project in name]
 
-            # Extract session ID from filename (handle various formats)
-            filename = os.path.basename(file_path)
-            session_id = filename.replace('.jsonl', '')
 
-            # Check if we need to (re)parse this file
-            if (session_id not in _conversation_cache or
-                _conversation_cache[session_id].get('mtime', 0) < current_mtime):
+def sessions_in_project(project: str) -> Iterator[str]:
+    """Cached sessions whose project name contains the project filter"""
+    return chain.from_iterable(_sessions_by_project[name] for name in projects_matching(project))
 
-                # Parse conversation
-                data = extract_conversation_data(file_path)
-                data['mtime'] = current_mtime
-                data['file_path'] = file_path
 
-                _conversation_cache[session_id] = data
+def parse_conversation_files(
+    files: List[Tuple[str, os.stat_result, Optional[ConversationEntry]]]
+) -> List[Optional[ConversationEntry]]:
+    """
+    Parse changed conversation files, in order.
+
+    A cold cache (hundreds of files) is CPU-bound JSON decoding, so it is
+    fanned out across processes. Small batches - the usual warm case - run
+    on threads, which overlap file reads without process start-up cost.
+    """
+    if not files:
+        return []
+
+    if len(files) == 1:
+        return [parse_conversation_file(*files[0])]
+
+    paths = [path for path, _, _ in files]
+    stats = [stat for _, stat, _ in files]
+    previous = [entry for _, _, entry in files]
+
+    if len(files) >= PROCESS_POOL_MIN_FILES:
+        try:
+            # Spawned, not forked: tool bodies run on a worker thread next to
+            # the event loop and stdio threads, and forking a threaded
+            # process can leave the child stuck on a lock held at the time
+            with ProcessPoolExecutor(max_workers=os.cpu_count(),
+                                     mp_context=multiprocessing.get_context('spawn')) as executor:
+                return list(executor.map(parse_conversation_file, paths, stats, previous, chunksize=8))
+        except (OSError, NotImplementedError, BrokenProcessPool) as e:
+            # No usable multiprocessing here (e.g. sandboxed) - use threads
+            print(f"Process pool unavailable, parsing on threads: {e}", file=sys.stderr)
+
+    with ThreadPoolExecutor(max_workers=min(PARSE_WORKERS, len(files))) as executor:
+        return list(executor.map(parse_conversation_file, paths, stats, previous))
 
-        except Exception as e:
-            print(f"Error processing {file_path}: {e}")
+
+def ensure_cache_fresh():
+    """
+    Check file mtimes/sizes and re-parse only changed conversations.
+    First run: ~5s to parse all files (once - the result is persisted)
+    Subsequent, including after a restart: ~60ms (stat calls + search)
+    """
+    global _snapshot_loaded, _cache_epoch
+
+    if not _snapshot_loaded:
+        for session_id, data in load_cache_snapshot().items():
+            cache_conversation(session_id, data)
+        _snapshot_loaded = True
+        _cache_epoch += 1
+
+    # Stat everything first; only files that changed get parsed
+    to_parse = []
+    seen_session_ids = set()
+    # Session ID -> (stat, path) of its file. The same file name can turn up
+    # in more than one project directory; the newest copy wins (then the
+    # greatest path), so the choice is the same on every call.
+    newest_files = {}
+
+    for file_entry in iter_conversation_files():
+        # Extract session ID from filename (handle various formats)
+        session_id = file_entry.name.replace('.jsonl', '')
+        seen_session_ids.add(session_id)
+
+        try:
+            stat = file_entry.stat()
+        except OSError as e:
+            print(f"Error processing {file_entry.path}: {e}")
             continue
 
+        newest = newest_files.get(session_id)
+        if (newest is None or
+            (stat.st_mtime_ns, file_entry.path) > (newest[0].st_mtime_ns, newest[1])):
+            newest_files[session_id] = (stat, file_entry.path)
+
+    for session_id, (stat, path) in newest_files.items():
+        # Check if we need to (re)parse this file
+        cached = _conversation_cache.get(session_id)
+        if (cached is None or
+            cached.file_path != path or
+            cached.mtime_ns != stat.st_mtime_ns or
+            cached.size != stat.st_size):
+            # A grown file is usually a live conversation with new turns
+            # appended, which can be parsed from where the last parse ended
+            grown = (cached is not None and cached.file_path == path and
+                     stat.st_size > cached.size)
+            to_parse.append((session_id, path, stat, cached if grown else None))
+
+    # The cache outlives the process, so forget conversations whose files are gone
+    removed = [session_id for session_id in _conversation_cache
+               if session_id not in seen_session_ids]
+    for session_id in removed:
+        evict_conversation(session_id)
+
+    changed = bool(removed)
+
+    parsed = parse_conversation_files([(path, stat, previous) for _, path, stat, previous in to_parse])
+
+    for (session_id, _, _, _), data in zip(to_parse, parsed):
+        if data is not None:
+            cache_conversation(session_id, data)
+            changed = True
+
+    if changed:
+        _cache_epoch += 1
+        schedule_snapshot_save()
+
+
+# ============================================================================
+# TRANSCRIPT CACHE
+# ============================================================================
+
+class TranscriptMessage(NamedTuple):
+    """One user/assistant message with a body, as the read tools return them"""
+    role: str
+    content: str
+    timestamp: str
+    message_index: int  # Position among all user/assistant entries (1-indexed)
+    user_turn: int      # User turn this message belongs to (0 before the first)
+
+
+def iter_transcript(file_path: str, offset: int = 0, message_index: int = 0, user_turn: int = 0,
+                    scan: Optional[Dict[str, Any]] = None) -> Iterator[TranscriptMessage]:
+    """
+    Yield the user/assistant messages with a body, parsing from byte offset
+    onwards. message_index and user_turn are the counts already reached
+    before offset (0 at the start of the file, or a transcript checkpoint).
+    """
+    for _, entry in iter_jsonl_lines(file_path, offset, scan):
+        if entry.get('type') not in MESSAGE_TYPES:
+            continue
+
+        message_index += 1
+        extracted = extract_message(entry)
+        if extracted is None:
+            continue
+
+        role, content = extracted
+        if role == 'user':
+            user_turn += 1
+
+        yield TranscriptMessage(role, content, entry.get('timestamp', ''), message_index, user_turn)
+
+
+def extend_transcript(transcript: Dict[str, Any], file_path: str, upto: Optional[int] = None):
+    """
+    Parse user/assistant messages into a transcript, in order, from where
+    its last parse stopped. Stops once it holds `upto` messages, or marks it
+    complete at the end of the file.
+    """
+    messages = transcript['messages']
+    user_turns = transcript['user_turns']
+    scan = {}
+
+    for message in iter_transcript(file_path, transcript['offset'], transcript['message_index'],
+                                   transcript['user_turn'], scan):
+        messages.append(message)
+        user_turns.append(message.user_turn)
+        # Rough footprint: text plus per-message object overhead
+        transcript['nbytes'] += len(message.content) + 200
+
+        if upto is not None and len(messages) >= upto:
+            transcript['offset'] = scan['position']
+            transcript['message_index'] = message.message_index
+            transcript['user_turn'] = message.user_turn
+            return
+
+    transcript['complete'] = True
+
+
+def get_transcript(session_id: str, data: ConversationEntry, upto: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Parsed messages of a cached conversation, loaded on first read.
+
+    Returns {'messages': [...], 'user_turns': [...]} where user_turns is the
+    non-decreasing user_turn of each message, for bisecting turn ranges.
+    With upto, only the first `upto` messages are guaranteed: parsing stops
+    there and resumes on a later call that needs more, so reading the start
+    of a long conversation doesn't parse all of it.
+
+    Entries are validated against the conversation's mtime/size; the least
+    recently read ones are dropped past TRANSCRIPT_CACHE_MAX_BYTES, and any
+    not read within TRANSCRIPT_CACHE_TTL.
+    Callers don't stat the file first: ensure_cache_fresh's scan has just
+    seen it, and cache hits never touch the disk.
+    """
+    global _transcript_cache_bytes
+
+    # Least recently read first, so expired entries are all at the front
+    now = time.monotonic()
+    while _transcript_cache:
+        oldest_id, oldest = next(iter(_transcript_cache.items()))
+        if now - oldest['read_at'] < TRANSCRIPT_CACHE_TTL:
+            break
+        drop_transcript(oldest_id)
+
+    transcript = _transcript_cache.get(session_id)
+    if (transcript is not None and
+        transcript['mtime_ns'] == data.mtime_ns and
+        transcript['size'] == data.size):
+        _transcript_cache.move_to_end(session_id)
+    else:
+        drop_transcript(session_id)
+        transcript = {
+            'mtime_ns': data.mtime_ns,
+            'size': data.size,
+            'messages': [],
+            'user_turns': [],
+            'nbytes': 0,
+            # Where extend_transcript resumes
+            'complete': False,
+            'offset': 0,
+            'message_index': 0,
+            'user_turn': 0
+        }
+        _transcript_cache[session_id] = transcript
+
+    transcript['read_at'] = now
+
+    if not transcript['complete'] and (upto is None or len(transcript['messages']) < upto):
+        nbytes = transcript['nbytes']
+        extend_transcript(transcript, data.file_path, upto)
+        _transcript_cache_bytes += transcript['nbytes'] - nbytes
+
+        # Always keep the transcript just loaded, even if it alone exceeds the cap
+        while _transcript_cache_bytes > TRANSCRIPT_CACHE_MAX_BYTES and len(_transcript_cache) > 1:
+            _, evicted = _transcript_cache.popitem(last=False)
+            _transcript_cache_bytes -= evicted['nbytes']
+
+    return transcript
+
+
+def get_transcript_window(session_id: str, data: ConversationEntry,
+                          start: int, stop: int) -> List[TranscriptMessage]:
+    """
+    Messages [start:stop] of a cached conversation (0 <= start).
+
+    Served through get_transcript when the cached transcript already reaches
+    the last checkpoint before start (or there is none), so reading onwards
+    from it costs no more than a fresh read. Otherwise the range is parsed
+    from that checkpoint and not cached: a window deep into a long
+    conversation costs about its own size, not everything before it.
+    """
+    if stop <= start:
+        return []
+
+    checkpoint = min(start // TRANSCRIPT_CHECKPOINT_INTERVAL, len(data.transcript_checkpoints))
+    skipped = checkpoint * TRANSCRIPT_CHECKPOINT_INTERVAL
+
+    transcript = _transcript_cache.get(session_id)
+    if (checkpoint == 0 or
+        (transcript is not None and
+         transcript['mtime_ns'] == data.mtime_ns and
+         transcript['size'] == data.size and
+         (transcript['complete'] or len(transcript['messages']) >= skipped))):
+        return get_transcript(session_id, data, upto=stop)['messages'][start:stop]
+
+    offset, message_index, user_turn = data.transcript_checkpoints[checkpoint - 1]
+    messages = iter_transcript(data.file_path, offset, message_index, user_turn)
+    return list(islice(messages, start - skipped, stop - skipped))
+
+
+def drop_transcript(session_id: str):
+    """Forget a cached transcript"""
+    global _transcript_cache_bytes
+
+    transcript = _transcript_cache.pop(session_id, None)
+    if transcript is not None:
+        _transcript_cache_bytes -= transcript['nbytes']
+
+
+# ============================================================================
+# RESULT CACHE
+# ============================================================================
+
+def cached_result(key: tuple) -> Optional[dict]:
+    """
+    A list/search result stored under key within RESULT_CACHE_TTL, or None.
+    Keys end with _cache_epoch, so results computed before the cache last
+    changed are never returned. Cached results are shared: don't mutate them.
+    An expired entry is dropped when looked up; unused ones fall off the end
+    of the LRU.
+    """
+    entry = _result_cache.get(key)
+    if entry is None:
+        return None
+
+    stored_at, result = entry
+    if time.monotonic() - stored_at >= RESULT_CACHE_TTL:
+        del _result_cache[key]
+        return None
+
+    _result_cache.move_to_end(key)
+    return result
+
+
+def store_result(key: tuple, result: dict) -> dict:
+    """Cache a list/search result under key, evicting the least recently used"""
+    _result_cache[key] = (time.monotonic(), result)
+    _result_cache.move_to_end(key)
+    while len(_result_cache) > RESULT_CACHE_MAX_ENTRIES:
+        _result_cache.popitem(last=False)
+    return result
+
 
 # ============================================================================
 # MCP TOOLS
 # ============================================================================
 
+# Serializes tool bodies: they share the caches and indexes above
+_tool_lock = threading.Lock()
+
+
+def run_in_thread(func):
+    """
+    Turn a synchronous tool body into an async tool that runs in a worker
+    thread, so file scans and parsing don't block the MCP event loop.
+    Bodies still run one at a time, which also keeps concurrent calls from
+    refreshing the cache in parallel.
+    """
+    def locked(*args, **kwargs):
+        with _tool_lock:
+            return func(*args, **kwargs)
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        return await asyncio.to_thread(locked, *args, **kwargs)
+
+    return wrapper
+
+
 @mcp.tool()
-async def list_conversations(limit: int = 20, project: Optional[str] = None) -> dict:
+@run_in_thread
+def list_conversations(limit: int = 20, project: Optional[str] = None) -> dict:
     """
     List recent conversations with todo-based summaries.
 
@@ -298,54 +1256,32 @@ async def list_conversations(limit: int = 20, project: Optional[str] = None) ->
     """
     ensure_cache_fresh()
 
-    conversations = []
-
-    for session_id, data in _conversation_cache.items():
-        # Filter by project if specified
-        if project and project not in data.get('project', ''):
-            continue
-
-        # Create summary from completed todos
-        completed = data['final_todos'].get('completed', [])
-        pending = data['final_todos'].get('pending', [])
-        in_progress = data['final_todos'].get('in_progress', [])
-
-        # Use todo summary if available, otherwise use user message arc
-        if completed:
-            summary = ', '.join(completed[:3])
-        else:
-            # Build arc from user messages: first + last
-            arc = data.get('user_message_arc', [])
-            user_turn_count = data.get('user_message_count', 0)
-
-            if len(arc) == 1:
-                summary = f"[1 turn] {arc[0]}"
-            elif len(arc) == 2:
-                summary = f"[{user_turn_count} turns] {arc[0]} ... {arc[1]}"
-            else:
-                summary = data.get('first_message', 'No todos')
-
-        conversations.append({
-            'sessionId': session_id,
-            'project': data.get('project', ''),
-            'timestamp': data.get('timestamp', ''),
-            'summary': summary,
-            'completed': completed,
-            'inProgress': in_progress,
-            'pending': pending,
-            'messageCount': data.get('message_count', 0),
-            'userMessageCount': data.get('user_message_count', 0),
-            'hasChapters': len(data.get('chapters', [])) > 0
-        })
+    key = ('list_conversations', limit, project, _cache_epoch)
+    result = cached_result(key)
+    if result is not None:
+        return result
+
+    # Rows are prebuilt at parse time, so each one is just a dict copy
+    if project:
+        # Filter by project: only the matching projects' sessions are ranked
+        newest = heapq.nlargest(
+            limit,
+            ((_conversation_cache[sid].timestamp, sid) for sid in sessions_in_project(project))
+        )
+    else:
+        newest = reversed(_sessions_by_timestamp[-limit:]) if limit > 0 else []
 
-    # Sort by timestamp (most recent first)
-    conversations.sort(key=lambda x: x['timestamp'] or '', reverse=True)
+    conversations = [
+        {'sessionId': session_id, **_conversation_cache[session_id].list_entry}
+        for _, session_id in newest
+    ]
 
-    return {'conversations': conversations[:limit]}
+    return store_result(key, {'conversations': conversations})
 
 
 @mcp.tool()
-async def search_conversations(query: str, limit: int = 20, project: Optional[str] = None) -> dict:
+@run_in_thread
+def search_conversations(query: str, limit: int = 20, project: Optional[str] = None) -> dict:
     """
     Search todo descriptions across all conversations.
 
@@ -360,83 +1296,115 @@ async def search_conversations(query: str, limit: int = 20, project: Optional[st
         project: Optional project filter
 
     Returns:
-        Ranked results with matched todos and summaries
+        Results ranked by BM25 relevance, with matched todos and summaries
     """
     ensure_cache_fresh()
 
-    query_terms = query.lower().split()
-    results = []
+    key = ('search_conversations', query, limit, project, _cache_epoch)
+    result = cached_result(key)
+    if result is not None:
+        return result
 
-    for session_id, data in _conversation_cache.items():
-        # Filter by project if specified
-        if project and project not in data.get('project', ''):
-            continue
+    query_terms = [encode_search_text(term) for term in QUERY_TERM_PATTERN.findall(query.lower())]
+
+    # Exact set of sessions containing each term, over the whole cache so the
+    # IDF doesn't depend on the project filter
+    term_sessions = [sessions_containing(term) for term in query_terms]
+    term_idfs = [bm25_idf(len(sessions)) for sessions in term_sessions]
+
+    candidates = set().union(*term_sessions)
+
+    # Filter by project if specified; checking each candidate's project is
+    # cheaper than collecting every session of the matching projects
+    if project:
+        projects = set(projects_matching(project))
+        candidates = {
+            session_id for session_id in candidates
+            if _conversation_cache[session_id].project in projects
+        }
 
-        score = 0
+    # Every candidate contains at least one term, and any hit scores above 0
+    total_matches = len(candidates)
+
+    # Upper bound on each candidate's score: every one of its lines matching
+    # every term it contains. Candidates are scored from the highest bound
+    # down, which fills the top results early and lets the rest be skipped.
+    bounded = []
+    for position, session_id in enumerate(sorted(candidates)):
+        data = _conversation_cache[session_id]
+        present_terms = [
+            (term, idf)
+            for term, sessions, idf in zip(query_terms, term_sessions, term_idfs)
+            if session_id in sessions
+        ]
+        line_count = search_line_count(data)
+        max_weight = bm25_term_weight(line_count, line_count)
+        bound = sum(idf * max_weight for _, idf in present_terms)
+        bounded.append((bound, position, session_id, present_terms))
+    bounded.sort(key=lambda candidate: candidate[0], reverse=True)
+
+    # Min-heap of the best `limit` matches so far, ordered like the results:
+    # BM25 score, then timestamp, then the earlier session ID on a tie. Only
+    # the final winners are turned into result dicts.
+    top = []
+
+    for bound, position, session_id, present_terms in bounded:
+        # Neither this candidate nor any later one can make the cut
+        if len(top) >= limit and (not top or round(bound, 4) < top[0][0][0]):
+            break
+
+        data = _conversation_cache[session_id]
+
+        # Term frequency = number of todos (or arc messages) containing the
+        # term. Terms absent from the session are never looked for.
+        term_hits = [(search_line_hits(data, term), idf) for term, idf in present_terms]
+
+        # BM25: rare terms outweigh common ones, repeated hits saturate, and
+        # long todo lists don't win just by having more lines to match
+        line_count = search_line_count(data)
+        score = sum(idf * bm25_term_weight(len(hits), line_count) for hits, idf in term_hits)
+
+        rank = (round(score, 4), data.timestamp or '', -position)
+        if len(top) < limit:
+            heapq.heappush(top, (rank, session_id, term_hits))
+        elif rank > top[0][0]:
+            heapq.heapreplace(top, (rank, session_id, term_hits))
+
+    results = []
+    for (score, _, _), session_id, term_hits in sorted(top, reverse=True):
+        data = _conversation_cache[session_id]
+        matched_lines = sorted(set().union(*(hits for hits, _ in term_hits)))
         matched_todos = []
         matched_user_messages = []
 
-        # Search all todos (completed + in_progress + pending)
-        all_todos = (data['final_todos'].get('completed', []) +
-                    data['final_todos'].get('in_progress', []) +
-                    data['final_todos'].get('pending', []))
-
-        for todo in all_todos:
-            todo_lower = todo.lower()
-            matches = sum(1 for term in query_terms if term in todo_lower)
-            if matches > 0:
-                score += matches
-                matched_todos.append(todo)
-
-        # If no todos, search through user message arc
-        if not all_todos:
-            user_arc = data.get('user_message_arc', [])
-            for msg in user_arc:
-                msg_lower = msg.lower()
-                matches = sum(1 for term in query_terms if term in msg_lower)
-                if matches > 0:
-                    score += matches
-                    matched_user_messages.append(msg)
-
-        if score > 0:
-            completed = data['final_todos'].get('completed', [])
-
-            # Build summary from todos or user message arc
-            if completed:
-                summary = ', '.join(completed[:3])
-            else:
-                arc = data.get('user_message_arc', [])
-                user_turn_count = data.get('user_message_count', 0)
-                if len(arc) == 2:
-                    summary = f"[{user_turn_count} turns] {arc[0][:80]} ... {arc[1][:80]}"
-                elif len(arc) == 1:
-                    summary = f"[{user_turn_count} turns] {arc[0][:100]}"
-                else:
-                    summary = data.get('first_message', '')[:100]
-
-            results.append({
-                'sessionId': session_id,
-                'score': score,
-                'matchedTodos': matched_todos,
-                'matchedUserMessages': matched_user_messages,
-                'summary': summary,
-                'project': data.get('project', ''),
-                'timestamp': data.get('timestamp', ''),
-                'userMessageCount': data.get('user_message_count', 0),
-                'hasChapters': len(data.get('chapters', [])) > 0
-            })
-
-    # Sort by score (descending), then timestamp (descending)
-    results.sort(key=lambda x: (x['score'], x['timestamp'] or ''), reverse=True)
+        # Search all todos (completed + in_progress + pending); if no todos,
+        # the user message arc was searched instead
+        if data.todos:
+            matched_todos = [data.todos[i] for i in matched_lines]
+        else:
+            matched_user_messages = [data.user_message_arc[i] for i in matched_lines]
 
-    return {
-        'results': results[:limit],
-        'totalMatches': len(results)
-    }
+        results.append({
+            'sessionId': session_id,
+            'score': score,
+            'matchedTodos': matched_todos,
+            'matchedUserMessages': matched_user_messages,
+            'summary': data.search_summary,
+            'project': data.project,
+            'timestamp': data.timestamp,
+            'userMessageCount': data.user_message_count,
+            'hasChapters': len(data.chapters) > 0
+        })
+
+    return store_result(key, {
+        'results': results,
+        'totalMatches': total_matches
+    })
 
 
 @mcp.tool()
-async def get_conversation_chapters(session_id: str) -> dict:
+@run_in_thread
+def get_conversation_chapters(session_id: str) -> dict:
     """
     Get natural chapter breaks based on completed todos.
 
@@ -452,30 +1420,30 @@ async def get_conversation_chapters(session_id: str) -> dict:
     """
     ensure_cache_fresh()
 
-    if session_id not in _conversation_cache:
+    data = get_cached_conversation(session_id)
+    if data is None:
         return {
             'error': f'Conversation {session_id} not found',
             'success': False
         }
 
-    data = _conversation_cache[session_id]
-
     return {
         'success': True,
         'sessionId': session_id,
-        'chapters': data.get('chapters', []),
+        'chapters': data.chapters,
         'pendingWork': [
             {'title': todo, 'status': 'pending'}
-            for todo in data['final_todos'].get('pending', [])
+            for todo in data.final_todos.pending
         ] + [
             {'title': todo, 'status': 'in_progress'}
-            for todo in data['final_todos'].get('in_progress', [])
+            for todo in data.final_todos.in_progress
         ]
     }
 
 
 @mcp.tool()
-async def get_conversation_context(
+@run_in_thread
+def get_conversation_context(
     session_id: str,
     start: int,
     end: int,
@@ -502,58 +1470,34 @@ async def get_conversation_context(
     """
     ensure_cache_fresh()
 
-    if session_id not in _conversation_cache:
+    data = get_cached_conversation(session_id)
+    if data is None:
         return {
             'error': f'Conversation {session_id} not found',
             'success': False
         }
 
-    data = _conversation_cache[session_id]
-    file_path = data.get('file_path')
-
-    if not file_path or not os.path.exists(file_path):
-        return {
-            'error': 'Conversation file not found',
-            'success': False
-        }
-
-    # Parse messages from file
-    entries = parse_jsonl_file(file_path)
-    messages = []
-    message_index = 0
-
-    for entry in entries:
-        if entry.get('type') in ['user', 'assistant']:
-            message_index += 1
-
-            if entry.get('type') == 'user' and entry.get('message'):
-                messages.append({
-                    'role': 'user',
-                    'content': extract_text_content(entry['message'].get('content', '')),
-                    'timestamp': entry.get('timestamp', ''),
-                    'index': message_index
-                })
-            elif entry.get('type') == 'assistant' and entry.get('message'):
-                text_parts = []
-                for item in entry['message'].get('content', []):
-                    if isinstance(item, dict) and item.get('type') == 'text':
-                        text_parts.append(item.get('text', ''))
-                messages.append({
-                    'role': 'assistant',
-                    'content': '\n'.join(text_parts),
-                    'timestamp': entry.get('timestamp', ''),
-                    'index': message_index
-                })
-
-    # Apply range with expansion
+    # Apply range with expansion; only the range itself needs parsing
+    total_messages = data.transcript_length
     actual_start = max(0, start - expand)
-    actual_end = min(len(messages), end + expand)
-
-    selected_messages = messages[actual_start:actual_end]
-
-    # Apply role filter if specified
-    if role:
-        selected_messages = [msg for msg in selected_messages if msg['role'] == role]
+    actual_end = min(total_messages, end + expand)
+    if actual_end >= 0:
+        window = get_transcript_window(session_id, data, actual_start, actual_end)
+    else:
+        # A negative end counts from the end of the conversation, so needs all of it
+        window = get_transcript(session_id, data)['messages'][actual_start:actual_end]
+
+    selected_messages = [
+        {
+            'role': msg.role,
+            'content': msg.content,
+            'timestamp': msg.timestamp,
+            'index': msg.message_index
+        }
+        for msg in window
+        # Apply role filter if specified
+        if not role or msg.role == role
+    ]
 
     return {
         'success': True,
@@ -561,14 +1505,15 @@ async def get_conversation_context(
         'messageRange': (actual_start, actual_end),
         'requestedRange': (start, end),
         'messages': selected_messages,
-        'totalMessages': len(messages),
+        'totalMessages': total_messages,
         'canExpandBefore': actual_start > 0,
-        'canExpandAfter': actual_end < len(messages)
+        'canExpandAfter': actual_end < total_messages
     }
 
 
 @mcp.tool()
-async def get_conversation_by_turns(
+@run_in_thread
+def get_conversation_by_turns(
     session_id: str,
     user_turn: int,
     context_turns: int = 2,
@@ -601,64 +1546,37 @@ async def get_conversation_by_turns(
     """
     ensure_cache_fresh()
 
-    if session_id not in _conversation_cache:
+    data = get_cached_conversation(session_id)
+    if data is None:
         return {
             'error': f'Conversation {session_id} not found',
             'success': False
         }
 
-    data = _conversation_cache[session_id]
-    file_path = data.get('file_path')
-
-    if not file_path or not os.path.exists(file_path):
-        return {
-            'error': 'Conversation file not found',
-            'success': False
-        }
-
-    # Parse and track user turns
-    entries = parse_jsonl_file(file_path)
-    messages_with_turns = []
-    user_turn_count = 0
-    message_index = 0
-
-    for entry in entries:
-        if entry.get('type') in ['user', 'assistant']:
-            message_index += 1
-
-            if entry.get('type') == 'user' and entry.get('message'):
-                user_turn_count += 1
-                messages_with_turns.append({
-                    'role': 'user',
-                    'content': extract_text_content(entry['message'].get('content', '')),
-                    'timestamp': entry.get('timestamp', ''),
-                    'userTurn': user_turn_count,
-                    'messageIndex': message_index
-                })
-            elif entry.get('type') == 'assistant' and entry.get('message'):
-                text_parts = []
-                for item in entry['message'].get('content', []):
-                    if isinstance(item, dict) and item.get('type') == 'text':
-                        text_parts.append(item.get('text', ''))
-                messages_with_turns.append({
-                    'role': 'assistant',
-                    'content': '\n'.join(text_parts),
-                    'timestamp': entry.get('timestamp', ''),
-                    'userTurn': user_turn_count,  # Associate with current user turn
-                    'messageIndex': message_index
-                })
+    transcript = get_transcript(session_id, data)
+    messages = transcript['messages']
+    user_turns = transcript['user_turns']
+    user_turn_count = user_turns[-1] if user_turns else 0
 
     # Find the target range of user turns
     target_start_turn = max(1, user_turn - context_turns)
     target_end_turn = min(user_turn_count, user_turn + context_turns)
 
-    # Filter messages by turn range
-    selected_messages = []
-    for msg in messages_with_turns:
-        msg_turn = msg.get('userTurn', 0)
-        if target_start_turn <= msg_turn <= target_end_turn:
-            if include_assistant or msg['role'] == 'user':
-                selected_messages.append(msg)
+    # user_turns is non-decreasing, so the turn range is one contiguous slice
+    lo = bisect_left(user_turns, target_start_turn)
+    hi = bisect_right(user_turns, target_end_turn)
+
+    selected_messages = [
+        {
+            'role': msg.role,
+            'content': msg.content,
+            'timestamp': msg.timestamp,
+            'userTurn': msg.user_turn,
+            'messageIndex': msg.message_index
+        }
+        for msg in messages[lo:hi]
+        if include_assistant or msg.role == 'user'
+    ]
 
     return {
         'success': True,
@@ -677,12 +1595,71 @@ async def get_conversation_by_turns(
     }
 
 
+@mcp.tool()
+@run_in_thread
+def get_conversation_page(
+    session_id: str,
+    cursor: int = 0,
+    batch: int = 50,
+    role: Optional[str] = None
+) -> dict:
+    """
+    Read a conversation front to back in fixed-size batches.
+
+    USAGE: For walking a whole conversation without pulling it into one response.
+    Start with cursor=0 and pass back nextCursor until it is null.
+
+    Args:
+        session_id: Session ID
+        cursor: Position to continue from (0 for the start, then nextCursor)
+        batch: Messages per page (default: 50)
+        role: Optional role filter - "user" for user messages only, "assistant" for assistant only, None for both
+
+    Returns:
+        One batch of messages and the cursor for the next one
+    """
+    ensure_cache_fresh()
+
+    data = get_cached_conversation(session_id)
+    if data is None:
+        return {
+            'error': f'Conversation {session_id} not found',
+            'success': False
+        }
+
+    total_messages = data.transcript_length
+    page_start = max(0, cursor)
+    page_end = min(total_messages, page_start + max(1, batch))
+    window = get_transcript_window(session_id, data, page_start, page_end)
+
+    selected_messages = [
+        {
+            'role': msg.role,
+            'content': msg.content,
+            'timestamp': msg.timestamp,
+            'index': msg.message_index
+        }
+        for msg in window
+        # Apply role filter if specified
+        if not role or msg.role == role
+    ]
+
+    return {
+        'success': True,
+        'sessionId': session_id,
+        'messages': selected_messages,
+        'totalMessages': total_messages,
+        'nextCursor': page_end if page_end < total_messages else None
+    }
+
+
 # ============================================================================
 # LEGACY TOOLS (Keep for backward compatibility)
 # ============================================================================
 
 @mcp.tool()
-async def get_conversation(
+@run_in_thread
+def get_conversation(
     session_id: str,
     max_messages: Optional[int] = None,
     recent_only: bool = False,
@@ -711,63 +1688,44 @@ async def get_conversation(
     """
     ensure_cache_fresh()
 
-    if session_id not in _conversation_cache:
+    data = get_cached_conversation(session_id)
+    if data is None:
         return {
             'error': f'Conversation {session_id} not found',
             'success': False
         }
 
-    data = _conversation_cache[session_id]
-    file_path = data.get('file_path')
+    total_messages = data.transcript_length
 
-    if not file_path or not os.path.exists(file_path):
-        return {
-            'error': 'Conversation file not found',
-            'success': False
-        }
-
-    # Parse all messages
-    entries = parse_jsonl_file(file_path)
-    messages = []
-
-    for entry in entries:
-        if entry.get('type') == 'user' and entry.get('message'):
-            messages.append({
-                'role': 'user',
-                'content': extract_text_content(entry['message'].get('content', '')),
-                'timestamp': entry.get('timestamp', '')
-            })
-        elif entry.get('type') == 'assistant' and entry.get('message'):
-            text_parts = []
-            for item in entry['message'].get('content', []):
-                if isinstance(item, dict) and item.get('type') == 'text':
-                    text_parts.append(item.get('text', ''))
-            messages.append({
-                'role': 'assistant',
-                'content': '\n'.join(text_parts),
-                'timestamp': entry.get('timestamp', '')
-            })
-
-    total_messages = len(messages)
-
-    # Apply filtering
+    # Apply filtering; only a window around a message can skip the rest
     if around_message is not None:
         start_idx = max(0, around_message - context_size)
         end_idx = min(total_messages, around_message + context_size + 1)
-        messages = messages[start_idx:end_idx]
-    elif recent_only:
-        messages = messages[-20:]
-    elif max_messages:
-        messages = messages[-max_messages:]
+        if end_idx >= 0:
+            window = get_transcript_window(session_id, data, start_idx, end_idx)
+        else:
+            # A negative end counts from the end of the conversation
+            window = get_transcript(session_id, data)['messages'][start_idx:end_idx]
+    else:
+        transcript = get_transcript(session_id, data)['messages']
+        if recent_only:
+            window = transcript[-20:]
+        elif max_messages:
+            window = transcript[-max_messages:]
+        else:
+            window = transcript
 
-    # Apply role filter if specified
-    if role:
-        messages = [msg for msg in messages if msg['role'] == role]
+    messages = [
+        {'role': msg.role, 'content': msg.content, 'timestamp': msg.timestamp}
+        for msg in window
+        # Apply role filter if specified
+        if not role or msg.role == role
+    ]
 
     return {
         'success': True,
         'sessionId': session_id,
-        'project': data.get('project', ''),
+        'project': data.project,
         'totalMessages': total_messages,
         'messageCount': len(messages),
         'messages': messages,
@@ -776,18 +1734,25 @@ async def get_conversation(
 
 
 @mcp.tool()
-async def list_projects() -> dict:
+@run_in_thread
+def list_projects() -> dict:
     """
     List all Claude Code projects.
 
     Returns:
         List of project names
     """
-    project_dirs = [d for d in glob_module.glob(os.path.join(CLAUDE_PROJECTS_PATH, "*"))
-                   if os.path.isdir(d)]
-    projects = [os.path.basename(d) for d in project_dirs]
+    global _projects_cache
+
+    try:
+        mtime_ns = os.stat(CLAUDE_PROJECTS_PATH).st_mtime_ns
+    except OSError:
+        mtime_ns = None
+
+    if _projects_cache is None or _projects_cache[0] != mtime_ns:
+        _projects_cache = (mtime_ns, [d.name for d in iter_project_dirs()])
 
-    return {'projects': projects}
+    return {'projects': list(_projects_cache[1])}
 
 
 if __name__ == "__main__":